@@ -1,9 +1,17 @@
 import streamlit as st
 import pandas as pd
-import altair as alt
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from snowflake.snowpark.context import get_active_session
 from snowflake.snowpark import Session
-from snowflake.snowpark.functions import col, sum as sum_, desc, count
+from snowflake.snowpark.exceptions import SnowparkSQLException
+from snowflake.snowpark.functions import call_function, col, desc, count
 
 # --- App Setup and Authentication ---
 st.set_page_config(layout="wide")
@@ -18,71 +26,96 @@ def create_session():
     try:
         # Check for secrets structure (Streamlit Cloud standard)
         if "connections" in st.secrets and "snowflake" in st.secrets["connections"]:
-            return Session.builder.configs(st.secrets["connections"]["snowflake"]).create()
+            session = Session.builder.configs(st.secrets["connections"]["snowflake"]).create()
         # Fallback for alternative secrets structure
         elif "snowflake" in st.secrets:
-             return Session.builder.configs(st.secrets["snowflake"]).create()
+             session = Session.builder.configs(st.secrets["snowflake"]).create()
         else:
              # Try getting active session (SiS) as last resort
-             return get_active_session()
+             session = get_active_session()
     except Exception as e:
         st.error(f"Failed to create Snowflake session. Check your secrets configuration. Error: {e}")
         return None
 
+    try:
+        # Smaller result chunks keep peak memory low during to_arrow
+        session.sql("ALTER SESSION SET CLIENT_RESULT_CHUNK_SIZE = 48").collect()
+    except SnowparkSQLException:
+        # Some environments (e.g. Streamlit in Snowflake) reject session parameter changes;
+        # the defaults still work
+        pass
+    return session
+
 session = create_session()
 if not session:
     st.stop()
 
 # --- Data Functions (Push-Down Aggregations) ---
 # All calculations are performed in Snowflake. Only summary data is downloaded.
+# Results come back as Arrow tables, which the charts and st.dataframe consume directly.
+# Cached results are shared by all viewers and refreshed every 10 minutes.
 
-@st.cache_data
-def get_city_sales():
-    """Aggregates total sales by city in Snowflake."""
-    try:
-        df = (
-            session.table("TB_101.ANALYTICS.ORDERS_V")
-            .group_by("PRIMARY_CITY")
-            .agg(sum_("ORDER_TOTAL").alias("ORDER_TOTAL"))
-            .sort(desc("ORDER_TOTAL"))
-        ).to_pandas()
-        return df
-    except Exception as e:
-        st.error(f"Error fetching city sales: {e}")
-        return pd.DataFrame()
+SALES_DIMENSIONS = ("PRIMARY_CITY", "DATE", "MENU_ITEM_NAME", "MARITAL_STATUS")
 
-@st.cache_data
-def get_daily_sales():
-    """Aggregates daily sales trend in Snowflake."""
-    try:
-        df = (
-            session.table("TB_101.ANALYTICS.ORDERS_V")
-            .group_by("DATE")
-            .agg(sum_("ORDER_TOTAL").alias("ORDER_TOTAL"))
-            .sort("DATE")
-        ).to_pandas()
-        return df
-    except Exception as e:
-        st.error(f"Error fetching daily sales: {e}")
-        return pd.DataFrame()
+# Snowflake error code for "Object does not exist or not authorized". Snowflake does not
+# tell the two apart; 06_app_aggregates.sql grants SALES_AGGREGATES to every role that
+# can read ORDERS_V, so for those roles this only means the table was never created.
+OBJECT_MISSING_OR_UNAUTHORIZED = 2003
 
-@st.cache_data
-def get_top_items():
-    """Finds top 10 menu items by sales in Snowflake."""
+# Must match the SALES_AGGREGATES dynamic table in 06_app_aggregates.sql; change both together
+SALES_AGGREGATES_SQL = """
+    SELECT PRIMARY_CITY, DATE, MENU_ITEM_NAME, MARITAL_STATUS,
+        SUM(ORDER_TOTAL) AS ORDER_TOTAL
+    FROM TB_101.ANALYTICS.ORDERS_V
+    GROUP BY GROUPING SETS (
+        (PRIMARY_CITY), (DATE), (MENU_ITEM_NAME), (MARITAL_STATUS)
+    )
+    QUALIFY GROUPING(MENU_ITEM_NAME) = 1
+        OR ROW_NUMBER() OVER (
+            PARTITION BY GROUPING(MENU_ITEM_NAME) ORDER BY SUM(ORDER_TOTAL) DESC
+        ) <= 10
+"""
+
+@st.cache_data(ttl=600)
+def load_sales_aggregates():
+    """
+    Aggregates sales by city, date, menu item and marital status in a single pass
+    over ORDERS_V. Returns one table per dimension. Only the top 10 menu items are kept.
+    Reads the pre-computed SALES_AGGREGATES table when it exists.
+    """
     try:
-        df = (
-            session.table("TB_101.ANALYTICS.ORDERS_V")
-            .group_by("MENU_ITEM_NAME")
-            .agg(sum_("ORDER_TOTAL").alias("ORDER_TOTAL"))
-            .sort(desc("ORDER_TOTAL"))
-            .limit(10)
-        ).to_pandas()
-        return df
+        try:
+            df = session.table("TB_101.ANALYTICS.SALES_AGGREGATES").to_arrow()
+        except SnowparkSQLException as e:
+            if e.sql_error_code != OBJECT_MISSING_OR_UNAUTHORIZED:
+                raise
+            # 06_app_aggregates.sql has not been run, so aggregate ORDERS_V directly
+            df = session.sql(SALES_AGGREGATES_SQL).to_arrow()
     except Exception as e:
-        st.error(f"Error fetching top items: {e}")
-        return pd.DataFrame()
+        st.error(f"Error fetching sales aggregates: {e}")
+        df = pa.table({})
+
+    # sales_by drops the NULL MARITAL_STATUS group of orders without a loyalty member
+    sales = {dimension: sales_by(df, dimension) for dimension in SALES_DIMENSIONS}
+    # Cast DATE to a timestamp and sort the trend once here instead of on every rerun
+    daily = sales["DATE"]
+    sales["DATE"] = daily.set_column(
+        0, "DATE", pc.cast(daily["DATE"], pa.timestamp("ms"))
+    ).sort_by("DATE")
+    return sales
 
-@st.cache_data
+def sales_by(aggregates, dimension):
+    """Slices the grouping set for one dimension out of the fused sales aggregates."""
+    if not aggregates.num_rows:
+        return pa.table({dimension: [], "ORDER_TOTAL": []})
+    # Rows of a grouping set carry NULL in every dimension they were not grouped by
+    mask = pc.is_valid(aggregates[dimension])
+    for other in SALES_DIMENSIONS:
+        if other != dimension:
+            mask = pc.and_(mask, pc.is_null(aggregates[other]))
+    return aggregates.filter(mask).select([dimension, "ORDER_TOTAL"])
+
+@st.cache_data(ttl=600)
 def get_reviews_by_brand():
     """Counts reviews per brand in Snowflake."""
     try:
@@ -90,45 +123,57 @@ def get_reviews_by_brand():
             session.table("TB_101.ANALYTICS.TRUCK_REVIEWS_V")
             .group_by("TRUCK_BRAND_NAME")
             .agg(count("*").alias("COUNT"))
-            .sort(desc("COUNT"))
-        ).to_pandas()
+        ).to_arrow()
         return df
     except Exception as e:
         st.error(f"Error fetching review counts: {e}")
-        return pd.DataFrame()
+        return pa.table({})
+
+# Local dev/demo only: set REVIEWS_PARQUET_CACHE=1 to keep a Parquet copy of recent reviews
+REVIEWS_PARQUET_CACHE = os.getenv("REVIEWS_PARQUET_CACHE") == "1"
+REVIEWS_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "reviews.parquet")
+REVIEWS_CACHE_MAX_AGE = 24 * 60 * 60  # seconds
 
-@st.cache_data
+@st.cache_data(ttl=600)
 def get_recent_reviews():
-    """Fetches the 50 most recent reviews from Snowflake."""
+    """
+    Fetches the 50 most recent reviews from Snowflake.
+    With REVIEWS_PARQUET_CACHE enabled, a local Parquet copy is reused for a day
+    so app restarts skip the query.
+    """
+    if (REVIEWS_PARQUET_CACHE and os.path.exists(REVIEWS_CACHE)
+            and time.time() - os.path.getmtime(REVIEWS_CACHE) < REVIEWS_CACHE_MAX_AGE):
+        try:
+            return pq.read_table(REVIEWS_CACHE)
+        except Exception:
+            # A corrupt or truncated copy falls through to Snowflake and is overwritten below
+            pass
     try:
         df = (
             session.table("TB_101.ANALYTICS.TRUCK_REVIEWS_V")
             .select("DATE", "TRUCK_BRAND_NAME", "REVIEW")
             .sort(desc("DATE"))
             .limit(50)
-        ).to_pandas()
-        return df
+        ).to_arrow()
     except Exception as e:
         st.error(f"Error fetching recent reviews: {e}")
-        return pd.DataFrame()
-
-@st.cache_data
-def get_loyalty_demographics():
-    """Aggregates sales by marital status and gender."""
-    try:
-        # Using ORDERS_V as it contains joined loyalty info + sales
-        df = (
-            session.table("TB_101.ANALYTICS.ORDERS_V")
-            .filter(col("MARITAL_STATUS").is_not_null())
-            .group_by("MARITAL_STATUS")
-            .agg(sum_("ORDER_TOTAL").alias("TOTAL_SALES"))
-        ).to_pandas()
-        return df
-    except Exception as e:
-        st.error(f"Error fetching demographics: {e}")
-        return pd.DataFrame()
+        return pa.table({})
+    if REVIEWS_PARQUET_CACHE:
+        # Write to a temp file and swap it in so readers never see a partial file
+        tmp_path = f"{REVIEWS_CACHE}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.makedirs(os.path.dirname(REVIEWS_CACHE), exist_ok=True)
+            pq.write_table(df, tmp_path, compression="zstd")
+            os.replace(tmp_path, REVIEWS_CACHE)
+        except Exception:
+            # An unwritable cache directory just skips the local copy
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+    return df
 
-@st.cache_data
+@st.cache_data(ttl=600)
 def get_top_customers():
     """Fetches top 10 customers by lifetime spend."""
     try:
@@ -137,74 +182,205 @@ def get_top_customers():
             .select("FIRST_NAME", "LAST_NAME", "CITY", "TOTAL_SALES")
             .sort(desc("TOTAL_SALES"))
             .limit(10)
-        ).to_pandas()
+        ).to_arrow()
         return df
     except Exception as e:
         st.error(f"Error fetching top customers: {e}")
-        return pd.DataFrame()
+        return pa.table({})
+
+# --- Cortex Functions ---
+# Cortex output is deterministic for a given input, so results are cached per input.
+
+@st.cache_data(ttl=3600, max_entries=512)
+def cortex_sentiment(text):
+    """Scores the sentiment of text from -1 to 1."""
+    query = "SELECT SNOWFLAKE.CORTEX.SENTIMENT(?) AS VAL"
+    return session.sql(query, params=[text]).collect()[0]['VAL']
+
+@st.cache_data(ttl=3600, max_entries=512)
+def cortex_translate(text, target):
+    """Translates English text into the target language."""
+    query = "SELECT SNOWFLAKE.CORTEX.TRANSLATE(?, 'en', ?) AS VAL"
+    return session.sql(query, params=[text, target]).collect()[0]['VAL']
+
+@st.cache_data(ttl=3600, max_entries=512)
+def cortex_summarize(text):
+    """Summarizes text."""
+    query = "SELECT SNOWFLAKE.CORTEX.SUMMARIZE(?) AS VAL"
+    return session.sql(query, params=[text]).collect()[0]['VAL']
+
+@st.cache_data(ttl=3600, max_entries=512)
+def cortex_extract(text, question):
+    """Answers a question from the contents of text."""
+    query = "SELECT SNOWFLAKE.CORTEX.EXTRACT_ANSWER(?, ?) AS VAL"
+    return session.sql(query, params=[text, question]).collect()[0]['VAL']
+
+# Every review in a batch is a billable Cortex call and batch results are not cached
+BATCH_MAX_REVIEWS = 100
+
+def batch_sentiment(df):
+    """
+    Scores a batch of reviews with Cortex SENTIMENT in a single query.
+    The reviews are uploaded through write_pandas, which stages them as Parquet
+    instead of issuing one INSERT per row.
+    """
+    tmp = f"CORTEX_BATCH_{uuid.uuid4().hex.upper()}"
+    try:
+        reviews = session.write_pandas(
+            df, tmp,
+            auto_create_table=True, overwrite=True, table_type="temporary",
+            use_logical_type=True, chunk_size=100_000, compression="snappy",
+        )
+        return (
+            reviews.select(
+                col("ID"),
+                col("REVIEW"),
+                call_function("SNOWFLAKE.CORTEX.SENTIMENT", col("REVIEW")).alias("SENTIMENT"),
+            )
+            .sort("ID")
+        ).to_arrow()
+    finally:
+        # The session is shared and long-lived, so temporary tables would otherwise pile up.
+        # write_pandas quotes the name, so drop it by the same quoted identifier.
+        try:
+            session.sql(f'DROP TABLE IF EXISTS "{tmp}"').collect()
+        except Exception:
+            # Don't let a failed cleanup mask the upload or query error; Snowflake
+            # still drops the temporary table when the session ends
+            pass
+
+def _parallel(*fns):
+    """
+    Runs independent loaders concurrently so their Snowflake round trips overlap.
+    Results are returned in the order the loaders were given.
+    """
+    ctx = get_script_run_ctx()
+
+    def run(fn):
+        # Attach the script context so st.cache_data and st.error work in the worker thread
+        add_script_run_ctx(ctx=ctx)
+        return fn()
+
+    with ThreadPoolExecutor(max_workers=len(fns)) as ex:
+        return [f.result() for f in [ex.submit(run, fn) for fn in fns]]
+
+# --- Chart Specs (Vega-Lite) ---
+# Plain Vega-Lite dicts skip Altair's per-rerun chart construction and validation.
+# Data is passed to st.vega_lite_chart separately.
+
+CITY_SPEC = {
+    "mark": "bar",
+    "encoding": {
+        "x": {"field": "ORDER_TOTAL", "type": "quantitative", "title": "Total Sales ($)"},
+        "y": {"field": "PRIMARY_CITY", "type": "nominal", "sort": "-x", "title": "City"},
+        "tooltip": [
+            {"field": "PRIMARY_CITY", "type": "nominal"},
+            {"field": "ORDER_TOTAL", "type": "quantitative"},
+        ],
+    },
+    "height": 400,
+}
+
+DAILY_SPEC = {
+    "mark": {"type": "line", "point": True},
+    "encoding": {
+        "x": {"field": "DATE", "type": "temporal", "title": "Date"},
+        "y": {"field": "ORDER_TOTAL", "type": "quantitative", "title": "Sales ($)"},
+        "tooltip": [
+            {"field": "DATE", "type": "temporal"},
+            {"field": "ORDER_TOTAL", "type": "quantitative"},
+        ],
+    },
+    "height": 300,
+}
+
+ITEM_SPEC = {
+    "mark": "bar",
+    "encoding": {
+        "x": {"field": "ORDER_TOTAL", "type": "quantitative", "title": "Total Sales ($)"},
+        "y": {"field": "MENU_ITEM_NAME", "type": "nominal", "sort": "-x", "title": "Menu Item"},
+        "tooltip": [
+            {"field": "MENU_ITEM_NAME", "type": "nominal"},
+            {"field": "ORDER_TOTAL", "type": "quantitative"},
+        ],
+    },
+    "height": 300,
+}
+
+DONUT_SPEC = {
+    "mark": {"type": "arc", "innerRadius": 50},
+    "encoding": {
+        "theta": {"field": "ORDER_TOTAL", "type": "quantitative", "stack": True},
+        "color": {"field": "MARITAL_STATUS", "type": "nominal"},
+        "tooltip": [
+            {"field": "MARITAL_STATUS", "type": "nominal"},
+            {"field": "ORDER_TOTAL", "type": "quantitative"},
+        ],
+    },
+    "height": 350,
+}
+
+BRAND_SPEC = {
+    "mark": "bar",
+    "encoding": {
+        "x": {"field": "COUNT", "type": "quantitative", "title": "Number of Reviews"},
+        "y": {"field": "TRUCK_BRAND_NAME", "type": "nominal", "sort": "-x", "title": "Truck Brand"},
+        # A single color; the y-axis already names each brand, so no legend is needed
+        "color": {"value": "#4C78A8"},
+        "tooltip": [
+            {"field": "TRUCK_BRAND_NAME", "type": "nominal"},
+            {"field": "COUNT", "type": "quantitative"},
+        ],
+    },
+    "height": 400,
+}
 
 # --- Layout & Features ---
 
-tab1, tab2, tab3, tab4 = st.tabs(["📊 Sales", "🏆 Loyalty", "💬 Reviews", "🧠 Cortex AI"])
+# st.tabs builds every tab on each run, which would run every tab's queries.
+# A radio picks the single view to build, so only its queries run.
+tab = st.radio("View", ["📊 Sales", "🏆 Loyalty", "💬 Reviews", "🧠 Cortex AI"],
+               horizontal=True, key="tab", label_visibility="collapsed")
 
 # --- TAB 1: Sales Analysis ---
-with tab1:
+if tab == "📊 Sales":
     st.header("Sales Performance")
     
-    city_sales_df = get_city_sales()
-    daily_sales_df = get_daily_sales()
-    top_items_df = get_top_items()
+    sales = load_sales_aggregates()
+    city_sales_df = sales["PRIMARY_CITY"]
+    daily_sales_df = sales["DATE"]
+    top_items_df = sales["MENU_ITEM_NAME"]
 
-    if not city_sales_df.empty:
+    if city_sales_df.num_rows:
         st.subheader("Total Sales by City")
-        city_chart = alt.Chart(city_sales_df).mark_bar().encode(
-            x=alt.X('ORDER_TOTAL:Q', title='Total Sales ($)'),
-            y=alt.Y('PRIMARY_CITY:N', sort='-x', title='City'),
-            tooltip=['PRIMARY_CITY', 'ORDER_TOTAL']
-        ).properties(height=400)
-        st.altair_chart(city_chart, use_container_width=True)
+        st.vega_lite_chart(city_sales_df, CITY_SPEC, use_container_width=True)
 
         col1, col2 = st.columns(2)
         with col1:
             st.subheader("Daily Sales Trend")
-            if not daily_sales_df.empty:
-                daily_chart = alt.Chart(daily_sales_df).mark_line(point=True).encode(
-                    x=alt.X('DATE:T', title='Date'),
-                    y=alt.Y('ORDER_TOTAL:Q', title='Sales ($)'),
-                    tooltip=['DATE', 'ORDER_TOTAL']
-                ).properties(height=300)
-                st.altair_chart(daily_chart, use_container_width=True)
+            if daily_sales_df.num_rows:
+                st.vega_lite_chart(daily_sales_df, DAILY_SPEC, use_container_width=True)
 
         with col2:
             st.subheader("Top 10 Menu Items")
-            if not top_items_df.empty:
-                item_chart = alt.Chart(top_items_df).mark_bar().encode(
-                    x=alt.X('ORDER_TOTAL:Q', title='Total Sales ($)'),
-                    y=alt.Y('MENU_ITEM_NAME:N', sort='-x', title='Menu Item'),
-                    tooltip=['MENU_ITEM_NAME', 'ORDER_TOTAL']
-                ).properties(height=300)
-                st.altair_chart(item_chart, use_container_width=True)
+            if top_items_df.num_rows:
+                st.vega_lite_chart(top_items_df, ITEM_SPEC, use_container_width=True)
     else:
         st.info("No sales data available.")
 
 # --- TAB 2: Loyalty Analytics ---
-with tab2:
+elif tab == "🏆 Loyalty":
     st.header("Loyalty Program Insights")
     
-    demo_df = get_loyalty_demographics()
-    top_cust_df = get_top_customers()
+    sales, top_cust_df = _parallel(load_sales_aggregates, get_top_customers)
+    demo_df = sales["MARITAL_STATUS"]
     
-    if not demo_df.empty:
+    if demo_df.num_rows:
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("Sales by Marital Status")
-            donut = alt.Chart(demo_df).mark_arc(innerRadius=50).encode(
-                theta=alt.Theta("TOTAL_SALES", stack=True),
-                color=alt.Color("MARITAL_STATUS"),
-                tooltip=["MARITAL_STATUS", "TOTAL_SALES"]
-            ).properties(height=350)
-            st.altair_chart(donut, use_container_width=True)
+            st.vega_lite_chart(demo_df, DONUT_SPEC, use_container_width=True)
             
         with col2:
             st.subheader("Top 10 VIP Customers")
@@ -214,24 +390,17 @@ with tab2:
         st.info("No loyalty data available.")
 
 # --- TAB 3: Customer Reviews ---
-with tab3:
+elif tab == "💬 Reviews":
     st.header("Customer Feedback")
     
-    brand_counts_df = get_reviews_by_brand()
-    recent_reviews_df = get_recent_reviews()
+    brand_counts_df, recent_reviews_df = _parallel(get_reviews_by_brand, get_recent_reviews)
     
-    if not brand_counts_df.empty:
+    if brand_counts_df.num_rows:
         col1, col2 = st.columns([1, 2])
         
         with col1:
             st.subheader("Reviews by Brand")
-            brand_chart = alt.Chart(brand_counts_df).mark_bar().encode(
-                x=alt.X('COUNT:Q', title='Number of Reviews'),
-                y=alt.Y('TRUCK_BRAND_NAME:N', sort='-x', title='Truck Brand'),
-                color='TRUCK_BRAND_NAME',
-                tooltip=['TRUCK_BRAND_NAME', 'COUNT']
-            ).properties(height=400)
-            st.altair_chart(brand_chart, use_container_width=True)
+            st.vega_lite_chart(brand_counts_df, BRAND_SPEC, use_container_width=True)
             
         with col2:
             st.subheader("Recent Reviews")
@@ -240,7 +409,7 @@ with tab3:
         st.info("No review data available.")
 
 # --- TAB 4: Cortex AI Playground ---
-with tab4:
+elif tab == "🧠 Cortex AI":
     st.header("🧠 Cortex AI")
     
     ai_choice = st.selectbox("Select AI Capability:", 
@@ -249,21 +418,36 @@ with tab4:
     user_input = st.text_area("Input Text (e.g., a review):", height=100,
                               placeholder="The burgers were delicious but the service was a bit slow.")
     
-    safe_input = user_input.replace("'", "''") if user_input else ""
-    
     # Display target language option if Translation is selected
     target_lang = "es"
     if ai_choice == "Translation":
         target_lang = st.selectbox("Target Language", ["es", "fr", "de", "it", "ja", "ko"])
 
+    # Batch mode scores one review per line in a single query
+    batch_mode = False
+    if ai_choice == "Sentiment Analysis":
+        batch_mode = st.toggle("Batch mode", help=f"Score each line of the input as a separate review "
+                                                  f"(up to {BATCH_MAX_REVIEWS}).")
+
     if st.button("Run AI"):
         if not user_input:
             st.warning("Please enter some text first.")
         else:
             try:
-                if ai_choice == "Sentiment Analysis":
-                    query = f"SELECT SNOWFLAKE.CORTEX.SENTIMENT('{safe_input}') AS VAL"
-                    val = session.sql(query).collect()[0]['VAL']
+                if batch_mode:
+                    reviews = [line.strip() for line in user_input.splitlines() if line.strip()]
+                    if not reviews:
+                        st.warning("Please enter at least one review.")
+                    else:
+                        if len(reviews) > BATCH_MAX_REVIEWS:
+                            st.warning(f"Batch mode scores at most {BATCH_MAX_REVIEWS} reviews; "
+                                       f"only the first {BATCH_MAX_REVIEWS} lines were scored.")
+                            reviews = reviews[:BATCH_MAX_REVIEWS]
+                        batch_df = pd.DataFrame({"ID": range(len(reviews)), "REVIEW": reviews})
+                        st.dataframe(batch_sentiment(batch_df), use_container_width=True, hide_index=True)
+
+                elif ai_choice == "Sentiment Analysis":
+                    val = cortex_sentiment(user_input)
                     st.metric("Sentiment Score (-1 to 1)", f"{val:.2f}")
                     if val > 0.2: st.success("Positive")
                     elif val < -0.2: st.error("Negative")
@@ -271,20 +455,17 @@ with tab4:
 
                 elif ai_choice == "Translation":
                     # Uses the target_lang selected above
-                    query = f"SELECT SNOWFLAKE.CORTEX.TRANSLATE('{safe_input}', 'en', '{target_lang}') AS VAL"
-                    val = session.sql(query).collect()[0]['VAL']
+                    val = cortex_translate(user_input, target_lang)
                     st.subheader("Translation:")
                     st.write(val)
                     
                 elif ai_choice == "Summarization":
-                    query = f"SELECT SNOWFLAKE.CORTEX.SUMMARIZE('{safe_input}') AS VAL"
-                    val = session.sql(query).collect()[0]['VAL']
+                    val = cortex_summarize(user_input)
                     st.subheader("Summary:")
                     st.write(val)
 
                 elif ai_choice == "Idea Extraction":
-                    query = f"SELECT SNOWFLAKE.CORTEX.EXTRACT_ANSWER('{safe_input}', 'What was good and what was bad?') AS VAL"
-                    val = session.sql(query).collect()[0]['VAL']
+                    val = cortex_extract(user_input, "What was good and what was bad?")
                     st.subheader("Key Points:")
                     st.write(val)
                     
@@ -1,7 +1,11 @@
+import urllib.error
 import urllib.request
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 SCRIPTS_DIR = "snowflake_automation/scripts"
+ETAGS_FILE = os.path.join(SCRIPTS_DIR, ".etags.json")
 os.makedirs(SCRIPTS_DIR, exist_ok=True)
 
 files = {
@@ -14,13 +18,59 @@ files = {
     "06_streamlit_app.py": "https://raw.githubusercontent.com/Snowflake-Labs/sfguide-getting-started-from-zero-to-snowflake/main/streamlit/streamlit_app.py"
 }
 
-for filename, url in files.items():
-    print(f"Downloading {filename}...")
+# ETags from the previous run, used to skip files that have not changed
+etags = {}
+if os.path.exists(ETAGS_FILE):
     try:
-        with urllib.request.urlopen(url) as response:
+        with open(ETAGS_FILE) as f:
+            etags = json.load(f)
+    except (OSError, ValueError):
+        # A corrupt ETag cache just means every file is downloaded again
+        etags = {}
+
+def download(filename, url):
+    """
+    Downloads url into SCRIPTS_DIR with a conditional GET.
+    Returns (saved, etag); saved is False when the local copy is already current.
+    """
+    path = os.path.join(SCRIPTS_DIR, filename)
+    request = urllib.request.Request(url)
+    if filename in etags and os.path.exists(path):
+        request.add_header("If-None-Match", etags[filename])
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
             content = response.read().decode('utf-8')
-            with open(os.path.join(SCRIPTS_DIR, filename), 'w') as f:
-                f.write(content)
-        print(f"Saved {filename}")
-    except Exception as e:
-        print(f"Failed to download {filename}: {e}")
+            etag = response.headers.get("ETag")
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return False, etags[filename]
+        raise
+    with open(path, 'w') as f:
+        f.write(content)
+    return True, etag
+
+# The downloads are independent, so fetch them concurrently
+with ThreadPoolExecutor(max_workers=len(files)) as ex:
+    futures = {}
+    for filename, url in files.items():
+        print(f"Downloading {filename}...")
+        futures[ex.submit(download, filename, url)] = filename
+
+    for future in as_completed(futures):
+        filename = futures[future]
+        try:
+            saved, etag = future.result()
+        except Exception as e:
+            print(f"Failed to download {filename}: {e}")
+            continue
+        print(f"Saved {filename}" if saved else f"Unchanged {filename}")
+        if etag:
+            etags[filename] = etag
+        else:
+            etags.pop(filename, None)
+
+# Write to a temp file and swap it in so an interrupted run never leaves a partial file
+tmp_path = f"{ETAGS_FILE}.tmp"
+with open(tmp_path, 'w') as f:
+    json.dump(etags, f, indent=2)
+os.replace(tmp_path, ETAGS_FILE)
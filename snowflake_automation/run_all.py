@@ -1,5 +1,4 @@
 import os
-import glob
 from utils import get_connection, execute_sql_file
 
 def main():
@@ -16,7 +15,10 @@ def main():
     # 2. Get all SQL scripts
     scripts_dir = os.path.join(os.path.dirname(__file__), 'scripts')
     # Sort by filename to ensure correct order (00, 01, 02...)
-    sql_files = sorted(glob.glob(os.path.join(scripts_dir, '*.sql')))
+    sql_files = sorted(
+        e.path for e in os.scandir(scripts_dir)
+        if e.is_file() and e.name.endswith('.sql') and not e.name.startswith('.')
+    )
 
     if not sql_files:
         print("No SQL scripts found in scripts directory.")
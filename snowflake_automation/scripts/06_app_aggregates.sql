@@ -0,0 +1,39 @@
+/***************************************************************************************************
+Asset:        Zero to Snowflake - Streamlit App Aggregates
+****************************************************************************************************/
+
+USE ROLE sysadmin;
+USE WAREHOUSE tb_de_wh;
+
+/*--
+ • sales aggregates for app.py
+   orders_v joins several tables, which materialized views do not support, so the
+   aggregates are kept in a dynamic table that Snowflake refreshes once a day.
+--*/
+
+-- one row per city, date and marital status, plus the top 10 menu items
+-- app.py runs the same query (SALES_AGGREGATES_SQL) when this table is missing; change both together
+CREATE OR REPLACE DYNAMIC TABLE tb_101.analytics.sales_aggregates
+    TARGET_LAG = '1 day'
+    WAREHOUSE = tb_de_wh
+COMMENT = 'Tasty Bytes sales aggregates for the Streamlit app'
+    AS
+SELECT
+    primary_city,
+    date,
+    menu_item_name,
+    marital_status,
+    SUM(order_total) AS order_total
+FROM tb_101.analytics.orders_v
+GROUP BY GROUPING SETS (
+    (primary_city), (date), (menu_item_name), (marital_status)
+)
+QUALIFY GROUPING(menu_item_name) = 1
+    OR ROW_NUMBER() OVER (
+        PARTITION BY GROUPING(menu_item_name) ORDER BY SUM(order_total) DESC
+    ) <= 10;
+
+-- same roles that can read analytics.orders_v, so the app never falls back to it for lack of access
+GRANT SELECT ON DYNAMIC TABLE tb_101.analytics.sales_aggregates TO ROLE tb_admin;
+GRANT SELECT ON DYNAMIC TABLE tb_101.analytics.sales_aggregates TO ROLE tb_data_engineer;
+GRANT SELECT ON DYNAMIC TABLE tb_101.analytics.sales_aggregates TO ROLE tb_dev;
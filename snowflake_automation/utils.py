@@ -31,26 +31,25 @@ def get_connection():
         warehouse=warehouse,
         role=role,
         database=database,
-        schema=schema
+        schema=schema,
+        session_parameters={"CLIENT_RESULT_CHUNK_SIZE": 48},
     )
     return conn
 
 def execute_sql_file(conn, file_path):
     """
-    Reads a SQL file and executes the commands using execute_string.
-    This handles comments and multiple statements correctly.
+    Executes the commands in a SQL file one statement at a time using execute_stream.
+    This handles comments and multiple statements correctly, and only one
+    statement's cursor is held in memory at a time.
     """
     print(f"Executing {file_path}...")
     with open(file_path, 'r') as f:
-        sql_content = f.read()
-
-    try:
-        # execute_string returns a list of cursors, one for each statement executed
-        cursors = conn.execute_string(sql_content)
-        for cursor in cursors:
-            # We can iterate over results if needed, but for DDL/DML usually just checking success is enough
-            print(f"Success: Statement executed (Query ID: {cursor.sfqid})")
-    except Exception as e:
-        print(f"Error executing file {file_path}:")
-        print(f"Error details: {e}")
-
+        try:
+            # execute_stream yields a cursor as each statement finishes executing
+            for cursor in conn.execute_stream(f):
+                # For DDL/DML, checking success is usually enough
+                print(f"Success: Statement executed (Query ID: {cursor.sfqid})")
+                cursor.close()
+        except Exception as e:
+            print(f"Error executing file {file_path}:")
+            print(f"Error details: {e}")